@@ -1,24 +1,37 @@
-import json
-import random
+import asyncio
+import contextlib
+import functools
+import gzip
+import os
+import pickle
 import time
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
-from typing import Dict, List, Tuple, Optional
-import requests
-from bs4 import BeautifulSoup
+from typing import Callable, Dict, List, Tuple, Optional
+import httpx
+import orjson
+from selectolax.lexbor import LexborHTMLParser
 import urllib.robotparser as robotparser
 
 # =========================
 # General Settings
 # =========================
-LIST_URL_TEMPLATE = BASE_URL + "/home/DrugSearch?page={page}"  # Pagination page
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+BASE_URL = ""                        # Set interactively in __main__
+OUTPUT_DIR = Path("scraped_data")    # Set interactively in __main__
+LIST_URL_TEMPLATE = "/home/DrugSearch?page={page}"  # Rebuilt from BASE_URL in __main__
 REQUEST_TIMEOUT = 30
-DELAY_MIN, DELAY_MAX = 0.6, 1.2      # Random delay between requests (politeness)
+DELAY_MIN, DELAY_MAX = 0.6, 1.2      # Politeness window; sets the default rate-limiter pace
 MAX_LIST_RETRIES = 3
 MAX_DETAIL_RETRIES = 3
 STOP_ON_CONSECUTIVE_LIST_FAILS = 5   # Stop if we fail to fetch this many consecutive list pages
+DETAIL_CONCURRENCY = 16              # Global cap on in-flight detail requests across all workers
+DETAIL_JITTER_MAX = 0.2              # Average spacing between detail request launches
+MAX_WORKERS = 8                      # Parallel page-processing worker processes
+KEEP_RAW_HTML = False                # Also write page_NNN_raw.jsonl.gz with the raw bodies
+# Per-process share of the detail cap, so MAX_WORKERS workers combined stay within it
+WORKER_DETAIL_CONCURRENCY = max(1, DETAIL_CONCURRENCY // MAX_WORKERS)
 
 # =========================
 # Simple Logging Setup
@@ -31,9 +44,12 @@ logging.basicConfig(
 # =========================
 # User-Agent Handling
 # =========================
+@functools.cache
 def get_user_agent() -> str:
     """
     Attempts to use fake_useragent if available, otherwise falls back to a default UA.
+    Cached so repeat callers skip the fake_useragent import and its data file,
+    and so the whole run presents one consistent UA.
     """
     try:
         from fake_useragent import UserAgent
@@ -45,14 +61,35 @@ def get_user_agent() -> str:
 # =========================
 # robots.txt Parser
 # =========================
+ROBOTS_CACHE_TTL = 24 * 3600         # Reuse the parsed robots.txt for up to a day
+
 def init_robots_parser(base_url: str) -> robotparser.RobotFileParser:
-    """Initializes a robotparser for the given base URL."""
+    """
+    Initializes a robotparser for the given base URL.
+    The parsed ruleset is pickled to OUTPUT_DIR/robots.pkl; runs within
+    ROBOTS_CACHE_TTL reuse it and skip the fetch and re-tokenization.
+    """
+    cache_file = OUTPUT_DIR / "robots.pkl"
+    try:
+        if cache_file.exists() and time.time() - cache_file.stat().st_mtime < ROBOTS_CACHE_TTL:
+            with cache_file.open("rb") as f:
+                rp = pickle.load(f)
+            logging.info("Loaded robots.txt rules from cache %s", cache_file)
+            return rp
+    except Exception as e:
+        logging.warning("Couldn't load robots cache (%s). Refetching.", e)
+
     rp = robotparser.RobotFileParser()
     robots_url = urljoin(base_url, "/robots.txt")
     try:
         rp.set_url(robots_url)
         rp.read()
         logging.info("Loaded robots.txt from %s", robots_url)
+        try:
+            with cache_file.open("wb") as f:
+                pickle.dump(rp, f)
+        except Exception as e:
+            logging.warning("Couldn't write robots cache (%s).", e)
     except Exception as e:
         logging.warning("Couldn't load robots.txt (%s). Proceeding cautiously.", e)
     return rp
@@ -69,46 +106,123 @@ def can_fetch(rp: robotparser.RobotFileParser, ua: str, path_or_url: str) -> boo
         # Fail open (assume allowed) if parser fails
         return True
 
+# =========================
+# Host Rate Limiter
+# =========================
+class TokenBucket:
+    """
+    Per-host request pacer. acquire() only sleeps for whatever is left of the
+    current politeness window, so time the server already spent answering the
+    previous request counts against it — fast responses mean little or no sleep.
+    The rate adapts to server feedback via update_from_headers.
+    """
+    def __init__(self, rate: float) -> None:
+        self.rate = rate                      # requests per second
+        self._next_free = time.monotonic()
+
+    def reserve(self) -> float:
+        """Books the next request slot and returns how long to wait for it.
+        Returns 0.0 when the slot is already due — time the previous request
+        spent in flight counts against the politeness window."""
+        now = time.monotonic()
+        wait = max(0.0, self._next_free - now)
+        self._next_free = max(now, self._next_free) + 1.0 / self.rate
+        return wait
+
+    def acquire(self) -> None:
+        """Blocks until the next request slot is free, then books the one after."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def update_from_headers(self, headers) -> None:
+        """Adapts pacing to server feedback (Retry-After, X-RateLimit-Remaining)."""
+        retry_after = headers.get("Retry-After", "").strip()
+        if retry_after.isdigit():
+            # The server asked for a precise pause — honor it exactly
+            self._next_free = time.monotonic() + int(retry_after)
+            return
+        remaining = headers.get("X-RateLimit-Remaining", "").strip()
+        if remaining.isdigit() and int(remaining) <= 1:
+            # Quota nearly exhausted — halve the request rate
+            self.rate = max(self.rate / 2, 0.1)
+
+# Default politeness budget: one request per (DELAY_MIN+DELAY_MAX)/2 seconds on average
+_buckets: Dict[str, TokenBucket] = {}
+
+def _bucket_for(url: str) -> TokenBucket:
+    """Returns the rate limiter for the URL's host, creating it on first use."""
+    netloc = urlparse(url).netloc
+    bucket = _buckets.get(netloc)
+    if bucket is None:
+        bucket = _buckets[netloc] = TokenBucket(rate=2.0 / (DELAY_MIN + DELAY_MAX))
+    return bucket
+
 # =========================
 # HTTP Session & Polite GET
 # =========================
-def build_session() -> requests.Session:
-    """Builds a requests.Session with default headers."""
-    s = requests.Session()
-    s.headers.update({
+def _default_headers() -> Dict[str, str]:
+    """Default request headers shared by the sync and async clients."""
+    return {
         "User-Agent": get_user_agent(),
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        # Compressed transfer; httpx decompresses transparently (brotli via the brotli package)
+        "Accept-Encoding": "br, gzip, deflate",
         "Accept-Language": "ar,en;q=0.9",
-        "Connection": "keep-alive",
-    })
-    return s
+    }
 
-def polite_get(session: requests.Session, url: str, retries: int) -> Optional[requests.Response]:
+def build_session() -> httpx.Client:
+    """
+    Builds an HTTP/2-capable httpx client with a tuned keep-alive pool.
+    With H2 the host multiplexes all listing fetches over one TCP+TLS
+    connection, so the handshake is paid once per run instead of per burst.
     """
-    Performs a GET request with random delay and exponential backoff on temporary errors.
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=32),
+        timeout=REQUEST_TIMEOUT,
+        follow_redirects=True,
+        headers=_default_headers(),
+    )
+
+def polite_get(session: httpx.Client, url: str) -> Optional[httpx.Response]:
     """
-    for attempt in range(1, retries + 1):
+    Performs a GET request paced by the per-host rate limiter, retrying
+    temporary errors (5xx, 429) with exponential backoff. httpx has no
+    urllib3-style status retry, so the retry loop lives here; server
+    rate-limit headers feed back into the limiter.
+    """
+    bucket = _bucket_for(url)
+    for attempt in range(1, MAX_LIST_RETRIES + 1):
         try:
-            time.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
-            resp = session.get(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
-
-            # Retry on server errors or rate limiting
-            if resp.status_code in (429,) or resp.status_code >= 500:
-                backoff = 1.5 * attempt
-                logging.warning("Got %s from %s. Backoff %.1fs", resp.status_code, url, backoff)
-                time.sleep(backoff)
-                continue
-            
-            return resp
-        
-        except requests.RequestException as e:
+            bucket.acquire()
+            resp = session.get(url)
+        except httpx.HTTPError as e:
             backoff = 1.5 * attempt
             logging.warning("Request error on %s (%s). Backoff %.1fs", url, e, backoff)
             time.sleep(backoff)
-            
-    logging.error("Failed after %d retries: %s", retries, url)
+            continue
+
+        bucket.update_from_headers(resp.headers)
+        if resp.status_code == 429 or resp.status_code >= 500:
+            backoff = 1.5 * attempt
+            logging.warning("Got %s from %s. Backoff %.1fs", resp.status_code, url, backoff)
+            time.sleep(backoff)
+            continue
+
+        return resp
+
+    logging.error("Failed after %d retries: %s", MAX_LIST_RETRIES, url)
     return None
 
+def decode_html(resp: httpx.Response) -> str:
+    """
+    Decodes a response body using the declared charset or UTF-8.
+    Bypasses any charset-detection fallback, which scans the whole body
+    and scales badly with page size — the portal serves UTF-8 throughout.
+    """
+    return resp.content.decode(resp.charset_encoding or "utf-8", errors="replace")
+
 # =========================
 # Parser: Listing Page (Collects Registration Nos. & Detail URLs)
 # =========================
@@ -118,118 +232,340 @@ def parse_listing_for_items(html: str) -> List[Tuple[str, str]]:
     based on the table inside div.table-responsive
     - First <td> = registration number
     - 'View' column contains <a href="/home/Result?drugId=XXXX">
+
+    Uses selectolax (lexbor C core): node text and attributes come back
+    as C-side string slices, with no Python object per tag.
     """
-    soup = BeautifulSoup(html, "lxml")
-    tbody = soup.select_one("div.table-responsive table.table.s-row tbody")
-    if not tbody:
-        logging.warning("Couldn't find results <tbody> in listing page.")
+    tree = LexborHTMLParser(html)
+    rows = tree.css("div.table-responsive table.s-row tbody tr")
+    if not rows:
+        logging.warning("Couldn't find result rows in listing page.")
         return []
 
+    base = BASE_URL.rstrip("/")
     items = []
-    for tr in tbody.select("tr"):
-        tds = tr.find_all("td")
+    for row in rows:
+        tds = row.css("td")
         if len(tds) < 5:
             continue
-        
-        reg_no = (tds[0].get_text(strip=True) or "").strip()
-        view_link = tds[-1].select_one("a[href]")
-        
-        if not reg_no or not view_link:
+
+        reg_no = tds[0].text(strip=True)
+        view_link = tds[-1].css_first("a[href]")
+
+        if not reg_no or view_link is None:
             continue
-            
-        detail_url = urljoin(BASE_URL, view_link["href"])
+
+        # Hrefs are site-relative (/home/Result?drugId=...), so plain string
+        # concatenation with the cached base skips urljoin's regex work per item
+        href = view_link.attributes["href"]
+        detail_url = base + href if href.startswith("/") else urljoin(BASE_URL, href)
         items.append((reg_no, detail_url))
-        
+
     return items
 
 def find_last_page_number(html: str) -> Optional[int]:
     """
     Tries to detect the last page number from the pagination bar:
-    - Searches inside <ul class="pagination"> for the last <a> with a number.
-    - If the current page is a <span>, take the max number found.
-    """
-    soup = BeautifulSoup(html, "lxml")
-    ul = soup.select_one("ul.pagination")
-    if not ul:
-        return None
-
-    nums = []
-    for a in ul.find_all("a", href=True):
-        txt = a.get_text(strip=True)
-        if txt.isdigit():
-            nums.append(int(txt))
-    
-    # If no <a> numbers, sometimes the current page is in a <span>
-    sp = ul.find("span")
-    if sp and sp.get_text(strip=True).isdigit():
-        nums.append(int(sp.get_text(strip=True)))
-        
+    - Collects the numbers of all <a> links inside <ul class="pagination">.
+    - The current page may be rendered as a <span>, so those count too.
+    """
+    tree = LexborHTMLParser(html)
+    nums = [
+        int(node.text(strip=True))
+        for node in tree.css("ul.pagination a[href], ul.pagination span")
+        if node.text(strip=True).isdigit()
+    ]
     return max(nums) if nums else None
 
 # =========================
-# Detail HTML Fetcher
+# Parser: Detail Page (Extracts the fields we actually keep)
 # =========================
-def fetch_detail_html(session: requests.Session, detail_url: str) -> Optional[str]:
-    """Fetches the raw HTML content of a single detail page."""
-    resp = polite_get(session, detail_url, retries=MAX_DETAIL_RETRIES)
-    if not resp or resp.status_code != 200:
-        return None
-    return resp.text
+def parse_detail(html: str) -> Dict[str, object]:
+    """
+    Extracts the structured fields from a detail (/home/Result) page.
+    The page renders the record as label/value table rows: the first cell
+    holds the field label, the remaining cells its value. Links to the
+    attached documents (PIL/SPC PDFs) are collected under "documents".
+    """
+    tree = LexborHTMLParser(html)
+
+    fields: Dict[str, object] = {}
+    for row in tree.css("table tr"):
+        cells = row.css("th, td")
+        if len(cells) < 2:
+            continue
+        label = cells[0].text(strip=True)
+        value = " ".join(c.text(strip=True) for c in cells[1:]).strip()
+        if label and value:
+            fields[label] = value
+
+    documents = [
+        urljoin(BASE_URL, a.attributes["href"])
+        for a in tree.css("a[href]")
+        if (a.attributes.get("href") or "").lower().endswith(".pdf")
+    ]
+    if documents:
+        fields["documents"] = documents
+
+    return fields
+
+# =========================
+# ETag Store (conditional GETs on re-crawls)
+# =========================
+# Maps reg_no -> {"etag": ..., "last_modified": ...}. On a re-crawl the stored
+# validators are sent as If-None-Match / If-Modified-Since, so unchanged detail
+# pages come back as an empty 304 instead of a full HTML transfer.
+_etags: Optional[Dict[str, Dict[str, str]]] = None
+
+def etags_path() -> Path:
+    return OUTPUT_DIR / "etags.json"
+
+def _get_etags() -> Dict[str, Dict[str, str]]:
+    """Lazily loads the validator store (once per process)."""
+    global _etags
+    if _etags is None:
+        _etags = {}
+        path = etags_path()
+        if path.exists():
+            try:
+                _etags = orjson.loads(path.read_bytes())
+            except ValueError as e:
+                logging.warning("Couldn't read %s (%s). Starting fresh.", path, e)
+    return _etags
+
+def _save_etags() -> None:
+    """
+    Merges this process's validators back into etags.json.
+    Re-reads the file first so concurrent workers only lose a key when both
+    updated the same reg_no, and replaces it atomically.
+    """
+    if not _etags:
+        return
+    path = etags_path()
+    merged: Dict[str, Dict[str, str]] = {}
+    if path.exists():
+        try:
+            merged = orjson.loads(path.read_bytes())
+        except ValueError:
+            pass
+    merged.update(_etags)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(orjson.dumps(merged))
+    os.replace(tmp, path)
+
+# =========================
+# Detail HTML Fetcher (async)
+# =========================
+async def fetch_detail_html(session: httpx.AsyncClient, sem: asyncio.Semaphore,
+                            bucket: TokenBucket, reg_no: str, detail_url: str) -> Optional[str]:
+    """
+    Fetches the raw HTML content of a single detail page with backoff on temporary errors.
+    Sends the stored ETag/Last-Modified validators, so an unchanged page costs
+    only a 304 with no body on re-crawls.
+    """
+    etags = _get_etags()
+    validators = etags.get(reg_no, {})
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    for attempt in range(1, MAX_DETAIL_RETRIES + 1):
+        try:
+            async with sem:
+                # Wait only for our booked launch slot — a task that already sat
+                # behind the semaphore long enough starts immediately
+                await asyncio.sleep(bucket.reserve())
+                resp = await session.get(detail_url, headers=headers or None)
+
+            if resp.status_code == 429 or resp.status_code >= 500:
+                backoff = 1.5 * attempt
+                logging.warning("Got %s from %s. Backoff %.1fs", resp.status_code, detail_url, backoff)
+                await asyncio.sleep(backoff)
+                continue
+            if resp.status_code == 304:
+                # Unchanged since last crawl — the stored record is still current
+                logging.info("Not modified: %s", detail_url)
+                return None
+            if resp.status_code != 200:
+                return None
+
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            if etag or last_modified:
+                etags[reg_no] = {"etag": etag or "", "last_modified": last_modified or ""}
+            return decode_html(resp)
+
+        except httpx.HTTPError as e:
+            backoff = 1.5 * attempt
+            logging.warning("Request error on %s (%s). Backoff %.1fs", detail_url, e, backoff)
+            await asyncio.sleep(backoff)
+
+    logging.error("Failed after %d retries: %s", MAX_DETAIL_RETRIES, detail_url)
+    return None
+
+async def fetch_all_details(items: List[Tuple[str, str]], ua: str,
+                            write: Callable[[str, str], None]) -> int:
+    """
+    Fetches all detail pages of one listing page concurrently, handing each
+    (reg_no, html) to `write` as soon as it completes, so only one HTML body
+    is held in memory at a time. Returns the number of items written.
+    """
+    headers = dict(_default_headers(), **{"User-Agent": ua})
+    # With HTTP/2 the concurrent streams share one multiplexed connection
+    limits = httpx.Limits(max_keepalive_connections=WORKER_DETAIL_CONCURRENCY,
+                          max_connections=WORKER_DETAIL_CONCURRENCY,
+                          keepalive_expiry=75)
+    sem = asyncio.Semaphore(WORKER_DETAIL_CONCURRENCY)
+    # Staggers request launches on a monotonic schedule instead of random jitter
+    bucket = TokenBucket(rate=2.0 / DETAIL_JITTER_MAX)
+
+    async def fetch_one(reg_no: str, url: str) -> Tuple[str, Optional[str]]:
+        return reg_no, await fetch_detail_html(session, sem, bucket, reg_no, url)
+
+    written = 0
+    async with httpx.AsyncClient(http2=True, limits=limits, headers=headers,
+                                 timeout=REQUEST_TIMEOUT, follow_redirects=True) as session:
+        for task in asyncio.as_completed([fetch_one(reg_no, url) for reg_no, url in items]):
+            reg_no, html = await task
+            if html:
+                write(reg_no, html)
+                written += 1
+    return written
 
 # =========================
 # Single Page Storage
 # =========================
-def save_page_json(page_index: int, mapping: Dict[str, str]) -> Path:
-    """Saves a dictionary of {reg_no: html_content} to a JSON file."""
-    fname = OUTPUT_DIR / f"page_{page_index:03d}.json"
-    with fname.open("w", encoding="utf-8") as f:
-        json.dump(mapping, f, ensure_ascii=False)
-    logging.info("Saved %s (%d items)", fname, len(mapping))
-    return fname
+def page_output_path(page_index: int) -> Path:
+    """Returns the gzip JSONL output path for a page (also the checkpoint marker)."""
+    return OUTPUT_DIR / f"page_{page_index:03d}.jsonl.gz"
+
+def completed_pages() -> set:
+    """
+    Returns the page numbers that already have an output file.
+    One directory scan replaces a stat syscall per page when resuming;
+    legacy .json files from pre-JSONL runs count as done too.
+    """
+    done = set()
+    for p in OUTPUT_DIR.glob("page_*.json*"):
+        num = p.name.split("_")[1].split(".")[0]
+        if num.isdigit():
+            done.add(int(num))
+    return done
+
+# =========================
+# Cross-Run Dedupe of Registration Numbers
+# =========================
+# Registration numbers already fetched (this run or earlier ones) are kept in
+# a plain text file, one per line. Appends are single short lines in append
+# mode, which is safe across worker processes.
+_seen_reg_nos: Optional[set] = None
+
+def seen_reg_nos_path() -> Path:
+    return OUTPUT_DIR / "seen_reg_nos.txt"
+
+def _get_seen_reg_nos() -> set:
+    """Lazily loads the set of already-fetched registration numbers."""
+    global _seen_reg_nos
+    if _seen_reg_nos is None:
+        path = seen_reg_nos_path()
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                _seen_reg_nos = {line.strip() for line in f if line.strip()}
+        else:
+            _seen_reg_nos = set()
+    return _seen_reg_nos
 
 # =========================
 # Page Processor (Fetches details and saves file)
 # =========================
-def process_one_page(session: requests.Session, rp: robotparser.RobotFileParser, ua: str, page_index: int) -> bool:
+def _process_listing_html(ua: str, page_index: int, html: str) -> bool:
+    """
+    Parses an already-fetched listing page, fetches its details and saves the file.
+    Split out of process_one_page so run_range can reuse the body it already
+    fetched for last-page detection instead of requesting the same URL twice.
+    """
+    items = parse_listing_for_items(html)
+    logging.info("Page %d: found %d items", page_index, len(items))
+    if not items:
+        # This could be the last page, which might be empty/unexpected
+        logging.warning("No items found on page %d", page_index)
+
+    # Skip registration numbers already fetched in this or a previous run
+    seen = _get_seen_reg_nos()
+    fresh = [(reg_no, url) for reg_no, url in items if reg_no not in seen]
+    if len(fresh) < len(items):
+        logging.info("Page %d: skipping %d already-fetched items", page_index, len(items) - len(fresh))
+
+    # Fetch all details concurrently (detail path already cleared against robots.txt)
+    # and stream each record straight into the gzip JSONL file as it completes.
+    # Records hold the extracted fields, not the raw HTML — 10-100x smaller and
+    # downstream consumers skip a second parse. Set KEEP_RAW_HTML for audit copies.
+    fname = page_output_path(page_index)
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(gzip.open(fname, "wb", compresslevel=5))
+        seen_f = stack.enter_context(seen_reg_nos_path().open("a", encoding="utf-8", buffering=1))
+        raw_f = None
+        if KEEP_RAW_HTML:
+            raw_fname = OUTPUT_DIR / f"page_{page_index:03d}_raw.jsonl.gz"
+            raw_f = stack.enter_context(gzip.open(raw_fname, "wb", compresslevel=5))
+
+        def write_record(reg_no: str, detail_html: str) -> None:
+            # orjson emits UTF-8 bytes directly — no per-char Python escaping
+            record = {"reg_no": reg_no, **parse_detail(detail_html)}
+            f.write(orjson.dumps(record) + b"\n")
+            if raw_f is not None:
+                raw_f.write(orjson.dumps({"reg_no": reg_no, "html": detail_html}) + b"\n")
+            seen_f.write(reg_no + "\n")
+            seen.add(reg_no)
+
+        written = asyncio.run(fetch_all_details(fresh, ua, write_record))
+
+    _save_etags()
+    logging.info("Saved %s (%d items)", fname, written)
+    return True
+
+def process_one_page(session: httpx.Client, ua: str, page_index: int) -> bool:
     """
     Returns True if the page file was saved (even if some items failed),
     False if the listing page itself failed to fetch.
+
+    robots.txt permissions for the listing and detail paths are checked
+    once in run_range — both paths are fixed, so there is no need to
+    re-walk the robots rules per page or per item.
     """
     list_url = LIST_URL_TEMPLATE.format(page=page_index)
 
-    # Check robots.txt for the listing path
-    if not can_fetch(rp, ua, "/home/DrugSearch"):
-        logging.error("robots disallows /home/DrugSearch — aborting page %d", page_index)
-        return False
-
     logging.info("Fetching listing page %d: %s", page_index, list_url)
-    resp = polite_get(session, list_url, retries=MAX_LIST_RETRIES)
+    resp = polite_get(session, list_url)
     if not resp or resp.status_code != 200:
         logging.error("Failed listing page %d", page_index)
         return False
 
-    items = parse_listing_for_items(resp.text)
-    logging.info("Page %d: found %d items", page_index, len(items))
-    if not items:
-        # This could be the last page, which might be empty/unexpected
-        logging.warning("No items found on page %d", page_index)
-
-    # Fetch details for each item and put them in a map
-    result_map: Dict[str, str] = {}
-    for reg_no, detail_url in items:
-        
-        # Check robots.txt for the detail path (usually /home/Result)
-        path = urlparse(detail_url).path
-        if not can_fetch(rp, ua, path):
-            logging.warning("robots disallows %s — skip", detail_url)
-            continue
-
-        html = fetch_detail_html(session, detail_url)
-        if html:
-            result_map[reg_no] = html
+    return _process_listing_html(ua, page_index, decode_html(resp))
 
-    save_page_json(page_index, result_map)
-    return True
+# =========================
+# Worker-Process Entry Points
+# =========================
+# Sessions and parsed robots state are not picklable, so each worker process
+# builds its own. The initializer also re-seeds the interactive globals, which
+# keeps things working under spawn as well as fork.
+_worker_session: Optional[httpx.Client] = None
+_worker_ua: str = ""
+
+def _init_worker(base_url: str, output_dir: Path) -> None:
+    """Per-process setup: one session and UA reused for all pages this worker handles."""
+    global _worker_session, _worker_ua, BASE_URL, OUTPUT_DIR, LIST_URL_TEMPLATE
+    BASE_URL = base_url
+    OUTPUT_DIR = output_dir
+    LIST_URL_TEMPLATE = base_url.rstrip('/') + "/home/DrugSearch?page={page}"
+    _worker_ua = get_user_agent()
+    _worker_session = build_session()
+
+def process_one_page_standalone(page_index: int) -> Tuple[int, bool]:
+    """Worker entry point: processes one page with the per-process session."""
+    return page_index, process_one_page(_worker_session, _worker_ua, page_index)
 
 # =========================
 # Range Runner (with auto-detection and checkpointing)
@@ -243,7 +579,7 @@ def run_range(start_page: int = 1, end_page: Optional[int] = None) -> None:
     ua = get_user_agent()
     rp = init_robots_parser(BASE_URL)
 
-    # Check general paths once
+    # Check both fixed paths once; every listing/detail URL reuses these decisions
     if not can_fetch(rp, ua, "/home/DrugSearch"):
         logging.error("robots disallows /home/DrugSearch — abort.")
         return
@@ -253,17 +589,19 @@ def run_range(start_page: int = 1, end_page: Optional[int] = None) -> None:
 
     session = build_session()
     consecutive_list_fails = 0
+    done_pages = completed_pages()
 
     # If end_page is unknown, fetch page 1 to auto-detect the last page
     if end_page is None:
         logging.info("end_page not set. Attempting to auto-detect last page...")
         first_url = LIST_URL_TEMPLATE.format(page=start_page)
-        resp = polite_get(session, first_url, retries=MAX_LIST_RETRIES)
+        resp = polite_get(session, first_url)
         if not resp or resp.status_code != 200:
             logging.error("Failed to fetch start page %d to detect last page.", start_page)
             return
             
-        last = find_last_page_number(resp.text)
+        first_html = decode_html(resp)
+        last = find_last_page_number(first_html)
         if not last:
             logging.warning("Couldn't detect last page automatically; will assume '%d' only.", start_page)
             last = start_page
@@ -271,38 +609,46 @@ def run_range(start_page: int = 1, end_page: Optional[int] = None) -> None:
         logging.info("Detected last page: %d", end_page)
 
         # Since we already fetched page 1 for detection, let's process it:
-        # If its file isn't saved, process it. Otherwise, skip.
-        out_file = OUTPUT_DIR / f"page_{start_page:03d}.json"
-        if out_file.exists():
+        # If its file isn't saved, process it from the body we already have.
+        if start_page in done_pages:
             logging.info("Skip page %d (already exists)", start_page)
         else:
             logging.info("Processing pre-fetched page %d...", start_page)
-            # We assume the items from the fetched page 'resp.text' should be processed here.
-            # (Note: The original code logic re-fetches the page inside process_one_page, which is fine)
-            ok = process_one_page(session, rp, ua, start_page) 
+            ok = _process_listing_html(ua, start_page, first_html)
             if not ok:
                 consecutive_list_fails += 1
             else:
                 consecutive_list_fails = 0
         start_page += 1  # Continue after the first page
 
-    # Loop through the rest of the pages
+    # Pages are independent units of work — fan the remaining ones out over a
+    # process pool. Results are consumed in submission order so the
+    # consecutive-failure stop condition keeps its meaning.
+    pending_pages = []
     for page in range(start_page, end_page + 1):
-        out_file = OUTPUT_DIR / f"page_{page:03d}.json"
-        if out_file.exists():
+        if page in done_pages:
             logging.info("Skip page %d (already exists)", page)
             continue
+        pending_pages.append(page)
 
-        ok = process_one_page(session, rp, ua, page)
-        
-        if not ok:
-            consecutive_list_fails += 1
-            logging.warning("Consecutive listing failures: %d", consecutive_list_fails)
-            if consecutive_list_fails >= STOP_ON_CONSECUTIVE_LIST_FAILS:
-                logging.error("Too many consecutive listing failures. Stopping.")
-                break
-        else:
-            consecutive_list_fails = 0
+    if not pending_pages:
+        return
+
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                             initargs=(BASE_URL, OUTPUT_DIR)) as executor:
+        futures = [executor.submit(process_one_page_standalone, page) for page in pending_pages]
+        for future in futures:
+            page, ok = future.result()
+
+            if not ok:
+                consecutive_list_fails += 1
+                logging.warning("Consecutive listing failures: %d", consecutive_list_fails)
+                if consecutive_list_fails >= STOP_ON_CONSECUTIVE_LIST_FAILS:
+                    logging.error("Too many consecutive listing failures. Stopping.")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+            else:
+                consecutive_list_fails = 0
 
 # =========================
 # Main Execution